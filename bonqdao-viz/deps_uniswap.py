@@ -1,5 +1,7 @@
-from collections import defaultdict, deque
+import heapq
+import networkx as nx
 from slither.slither import Slither
+from slither.core.declarations.function import Function
 
 # sl = Slither(".", compile_force_framework="solc")
 sl = Slither(
@@ -13,14 +15,24 @@ sl = Slither(
 
 
 
+_fid_cache = {}
+
 def fn_id(f):
-    return f"{f.contract.name}.{f.name}"
+    k = id(f)
+    s = _fid_cache.get(k)
+    if s is None:
+        s = _fid_cache[k] = f"{f.contract.name}.{f.name}"
+    return s
 
 # 1) Build maps: function -> reads/writes
-fn_reads = defaultdict(set)
-fn_writes = defaultdict(set)
-fn_calls = defaultdict(set)
+#    Each function's sets are materialized once and frozen; overloads that
+#    share an id are merged.
+fn_reads = {}
+fn_writes = {}
+fn_calls = {}
 entrypoints = set()
+_F = Function
+_EMPTY = frozenset()
 
 for c in sl.contracts:
     for f in c.functions:
@@ -28,37 +40,63 @@ for c in sl.contracts:
         if f.visibility in ("public", "external") and not f.is_constructor:
             entrypoints.add(fid)
 
-        for v in getattr(f, "state_variables_read", []):
-            fn_reads[fid].add(f"{v.contract.name}.{v.name}")
-        for v in getattr(f, "state_variables_written", []):
-            fn_writes[fid].add(f"{v.contract.name}.{v.name}")
-        for g in getattr(f, "internal_calls", []):
-            if g:
-                fn_calls[fid].add(fn_id(g))
+        reads = frozenset(
+            f"{v.contract.name}.{v.name}"
+            for v in getattr(f, "state_variables_read", ())
+        )
+        writes = frozenset(
+            f"{v.contract.name}.{v.name}"
+            for v in getattr(f, "state_variables_written", ())
+        )
+        calls = set()
+        for call in getattr(f, "internal_calls", ()):
+            g = getattr(call, "function", None)
+            if g is not None and isinstance(g, _F):
+                calls.add(fn_id(g))
+
+        fn_reads[fid] = fn_reads.get(fid, _EMPTY) | reads
+        fn_writes[fid] = fn_writes.get(fid, _EMPTY) | writes
+        fn_calls[fid] = fn_calls.get(fid, _EMPTY) | frozenset(calls)
 
 # 2) Derive “influence”: entrypoint -> reachable -> writes
+#    Each strongly connected component of the call graph is resolved once,
+#    callees first, so entrypoints share their callees' reachable sets and
+#    aggregated reads/writes.
+G = nx.DiGraph()
+G.add_nodes_from(entrypoints)
+for fid, callees in fn_calls.items():
+    G.add_edges_from((fid, g) for g in callees)
+
+dag = nx.condensation(G)
+scc_of = dag.graph["mapping"]
+reach_scc = {}
+writes_scc = {}
+reads_scc = {}
+for s in reversed(list(nx.topological_sort(dag))):
+    members = dag.nodes[s]["members"]
+    reach = set(members)
+    writes = set().union(*(fn_writes.get(f, _EMPTY) for f in members))
+    reads = set().union(*(fn_reads.get(f, _EMPTY) for f in members))
+    for t in dag.successors(s):
+        reach |= reach_scc[t]
+        writes |= writes_scc[t]
+        reads |= reads_scc[t]
+    reach_scc[s] = reach
+    writes_scc[s] = writes
+    reads_scc[s] = reads
+
 def reachable(start):
-    seen = set([start])
-    q = deque([start])
-    while q:
-        cur = q.popleft()
-        for nxt in fn_calls.get(cur, []):
-            if nxt not in seen:
-                seen.add(nxt)
-                q.append(nxt)
-    return seen
+    return reach_scc[scc_of[start]]
 
 # 3) Print top attack-surface-ish entrypoints by write footprint
 ranked = []
 for e in sorted(entrypoints):
     reach = reachable(e)
-    writes = set().union(*(fn_writes[r] for r in reach))
-    reads  = set().union(*(fn_reads[r] for r in reach))
+    writes = writes_scc[scc_of[e]]
+    reads  = reads_scc[scc_of[e]]
     ranked.append((len(writes), len(reads), e, writes, reads, reach))
 
-ranked.sort(reverse=True)
-
-for wcnt, rcnt, e, writes, reads, reach in ranked[:30]:
+for wcnt, rcnt, e, writes, reads, reach in heapq.nlargest(30, ranked):
     print("=" * 80)
     print(f"ENTRYPOINT: {e}")
     print(f"  reachable_fns: {len(reach)-1}")
@@ -11,22 +11,28 @@ Output:
     dependency_graph_report.pdf
 """
 
-import json
+import orjson
 import yaml
-import math
+import matplotlib
+matplotlib.use("Agg")
+
 import networkx as nx
-import matplotlib.pyplot as plt
 
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from matplotlib.figure import Figure
+from pypdf import PdfReader, PdfWriter, Transformation
 from reportlab.lib.pagesizes import LETTER
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import inch
-from tempfile import NamedTemporaryFile
-from pathlib import Path
 
 
 INPUT_FILE = "slither_dependency_graph.json"
 OUTPUT_PDF = "dependency_graph_report.pdf"
 
+# libyaml C loader when PyYAML was built with it
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 # ------------------------------------------------------------
 # Utility
@@ -34,23 +40,22 @@ OUTPUT_PDF = "dependency_graph_report.pdf"
 
 def load_graph(path):
     if path.endswith(".json"):
-        with open(path) as f:
-            return json.load(f)
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
     if path.endswith(".yaml") or path.endswith(".yml"):
         with open(path) as f:
-            return yaml.safe_load(f)
+            return yaml.load(f, Loader=YAML_LOADER)
     raise ValueError("Unsupported file type")
 
 
-def save_matplotlib_fig_to_temp():
-    tmp = NamedTemporaryFile(delete=False, suffix=".png")
-    plt.savefig(tmp.name, bbox_inches="tight")
-    plt.close()
-    return tmp.name
+def fig_to_pdf(fig):
+    buf = BytesIO()
+    fig.savefig(buf, format="pdf", bbox_inches="tight")
+    return buf.getvalue()
 
 
-def draw_page(c, title, description, image_path):
-    width, height = LETTER
+def draw_page(c, title, description):
+    _, height = LETTER
 
     c.setFont("Helvetica-Bold", 14)
     c.drawString(1 * inch, height - 1 * inch, title)
@@ -61,54 +66,87 @@ def draw_page(c, title, description, image_path):
         text.textLine(line)
     c.drawText(text)
 
-    c.drawImage(
-        image_path,
-        1 * inch,
-        1 * inch,
-        width=width - 2 * inch,
-        height=height - 3.5 * inch,
-        preserveAspectRatio=True,
-    )
-
     c.showPage()
 
 
+def place_figure(page, fig_pdf):
+    """
+    Merge a single-page figure PDF into the image area of a report page,
+    scaled to fit and centered, keeping it vector.
+    """
+    width, height = LETTER
+    box_w, box_h = width - 2 * inch, height - 3.5 * inch
+
+    fig_page = PdfReader(BytesIO(fig_pdf)).pages[0]
+    fig_w = float(fig_page.mediabox.width)
+    fig_h = float(fig_page.mediabox.height)
+
+    scale = min(box_w / fig_w, box_h / fig_h)
+    tx = 1 * inch + (box_w - fig_w * scale) / 2
+    ty = 1 * inch + (box_h - fig_h * scale) / 2
+
+    page.merge_transformed_page(
+        fig_page,
+        Transformation().scale(scale).translate(tx, ty),
+    )
+
+
 # ------------------------------------------------------------
 # Graph builders
 # ------------------------------------------------------------
 
 def build_bipartite_graph(data):
-    G = nx.DiGraph()
+    edges = {"reads": set(), "writes": set()}
 
     for edge in data["edges"]:
-        if edge["type"] in ("reads", "writes"):
-            src, dst = edge["from"], edge["to"]
-            if edge["type"] == "reads":
-                G.add_edge(dst, src, type="reads")   # variable → function
-            else:
-                G.add_edge(src, dst, type="writes")  # function → variable
+        if edge["type"] == "reads":
+            edges["reads"].add((edge["to"], edge["from"]))   # variable → function
+        elif edge["type"] == "writes":
+            edges["writes"].add((edge["from"], edge["to"]))  # function → variable
+
+    G = nx.DiGraph()
+    for kind, pairs in edges.items():
+        G.add_edges_from(pairs, type=kind)
 
     return G
 
 
+def iter_bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
 def build_function_influence_graph(data):
+    # Writer/reader sets are int bitmasks over a dense function index
+    fns = list(data["functions"])
+    idx = {fn: i for i, fn in enumerate(fns)}
+
     writers = {}
     readers = {}
 
     for fn, meta in data["functions"].items():
+        bit = 1 << idx[fn]
         for v in meta["writes"]:
-            writers.setdefault(v, set()).add(fn)
+            writers[v] = writers.get(v, 0) | bit
         for v in meta["reads"]:
-            readers.setdefault(v, set()).add(fn)
+            readers[v] = readers.get(v, 0) | bit
 
-    G = nx.DiGraph()
+    influence = [0] * len(fns)
+
+    for v, w_mask in writers.items():
+        r_mask = readers.get(v, 0)
+        if r_mask:
+            for w in iter_bits(w_mask):
+                influence[w] |= r_mask & ~(1 << w)
 
-    for v in writers:
-        if v in readers:
-            for w in writers[v]:
-                for r in readers[v]:
-                    if w != r:
-                        G.add_edge(w, r, via=v)
+    G = nx.DiGraph()
+    G.add_edges_from(
+        (fns[w], fns[r])
+        for w, r_mask in enumerate(influence)
+        for r in iter_bits(r_mask)
+    )
 
     return G
 
@@ -127,53 +165,62 @@ def render_bipartite(G):
     for i, v in enumerate(sorted(vars_)):
         pos[v] = (i, 0)
 
-    plt.figure(figsize=(12, 8))
+    fig = Figure(figsize=(12, 8))
+    ax = fig.add_subplot()
 
-    nx.draw_networkx_nodes(G, pos, nodelist=funcs, node_color="#6baed6", node_size=800)
-    nx.draw_networkx_nodes(G, pos, nodelist=vars_, node_color="#74c476", node_size=800)
+    nx.draw_networkx_nodes(G, pos, nodelist=funcs, node_color="#6baed6", node_size=800, ax=ax)
+    nx.draw_networkx_nodes(G, pos, nodelist=vars_, node_color="#74c476", node_size=800, ax=ax)
 
     read_edges = [(u, v) for u, v, d in G.edges(data=True) if d["type"] == "reads"]
     write_edges = [(u, v) for u, v, d in G.edges(data=True) if d["type"] == "writes"]
 
-    nx.draw_networkx_edges(G, pos, edgelist=read_edges, edge_color="gray", arrows=True)
-    nx.draw_networkx_edges(G, pos, edgelist=write_edges, edge_color="red", arrows=True)
+    nx.draw_networkx_edges(G, pos, edgelist=read_edges, edge_color="gray", arrows=True, ax=ax)
+    nx.draw_networkx_edges(G, pos, edgelist=write_edges, edge_color="red", arrows=True, ax=ax)
 
-    nx.draw_networkx_labels(G, pos, font_size=7)
+    nx.draw_networkx_labels(G, pos, font_size=7, ax=ax)
 
-    plt.axis("off")
+    ax.set_axis_off()
+    return fig
 
 
 def render_function_graph(G, layout="spring"):
-    plt.figure(figsize=(10, 8))
+    fig = Figure(figsize=(10, 8))
+    ax = fig.add_subplot()
 
     if layout == "spring":
+        # networkx >= 3.5 switches to the L-BFGS energy minimizer at 500+ nodes
         pos = nx.spring_layout(G, seed=42)
     elif layout == "shell":
         pos = nx.shell_layout(G)
     else:
         pos = nx.circular_layout(G)
 
-    nx.draw_networkx_nodes(G, pos, node_color="#9ecae1", node_size=1000)
-    nx.draw_networkx_edges(G, pos, arrowstyle="->", arrowsize=12)
-    nx.draw_networkx_labels(G, pos, font_size=8)
+    nx.draw_networkx_nodes(G, pos, node_color="#9ecae1", node_size=1000, ax=ax)
+    nx.draw_networkx_edges(G, pos, arrowstyle="->", arrowsize=12, ax=ax)
+    nx.draw_networkx_labels(G, pos, font_size=8, ax=ax)
 
-    plt.axis("off")
+    ax.set_axis_off()
+    return fig
 
 
 # ------------------------------------------------------------
-# Main
+# Pages
 # ------------------------------------------------------------
 
-def main():
-    data = load_graph(INPUT_FILE)
-    c = canvas.Canvas(OUTPUT_PDF, pagesize=LETTER)
-
-    # Page 1: Bipartite
-    B = build_bipartite_graph(data)
-    render_bipartite(B)
-    img = save_matplotlib_fig_to_temp()
-    draw_page(
-        c,
+# Each page renders to PDF bytes in its own worker process
+
+def render_bipartite_page(data):
+    return fig_to_pdf(render_bipartite(build_bipartite_graph(data)))
+
+
+def render_function_page(data, layout):
+    return fig_to_pdf(render_function_graph(build_function_influence_graph(data), layout=layout))
+
+
+PAGES = [
+    (
+        render_bipartite_page,
+        (),
         "Bipartite Function–Variable Dependency Graph",
         "This is a directed bipartite graph.\n"
         "Top nodes represent functions; bottom nodes represent state variables.\n"
@@ -181,39 +228,55 @@ def main():
         "Edges from functions to variables indicate writes.\n"
         "Disconnected nodes are removed.\n"
         "Layout: vertical bipartite. Colors encode node type and write edges.",
-        img,
-    )
-
-    # Page 2: Function influence (spring)
-    F = build_function_influence_graph(data)
-    render_function_graph(F, layout="spring")
-    img = save_matplotlib_fig_to_temp()
-    draw_page(
-        c,
+    ),
+    (
+        render_function_page,
+        ("spring",),
         "Function Influence Graph (Spring Layout)",
         "Nodes represent functions.\n"
         "An edge exists if one function writes a variable that another function reads.\n"
         "This graph highlights indirect semantic influence via shared state.\n"
         "Layout: force-directed (spring).",
-        img,
-    )
-
-    # Page 3: Function influence (shell)
-    render_function_graph(F, layout="shell")
-    img = save_matplotlib_fig_to_temp()
-    draw_page(
-        c,
+    ),
+    (
+        render_function_page,
+        ("shell",),
         "Function Influence Graph (Shell Layout)",
         "Same influence graph as previous page.\n"
         "Different layout emphasizes layering and clustering.\n"
         "Useful for comparing structural stability across layouts.",
-        img,
-    )
+    ),
+]
+
 
+# ------------------------------------------------------------
+# Main
+# ------------------------------------------------------------
+
+def main():
+    data = load_graph(INPUT_FILE)
+
+    # Titles and descriptions come from reportlab; figures are merged in
+    overlay = BytesIO()
+    c = canvas.Canvas(overlay, pagesize=LETTER)
+    for _, _, title, description in PAGES:
+        draw_page(c, title, description)
     c.save()
+
+    writer = PdfWriter()
+
+    with ProcessPoolExecutor(max_workers=len(PAGES)) as ex:
+        futures = [ex.submit(render, data, *args) for render, args, _, _ in PAGES]
+
+        for page, fut in zip(PdfReader(overlay).pages, futures):
+            place_figure(page, fut.result())
+            writer.add_page(page)
+
+    with open(OUTPUT_PDF, "wb") as f:
+        writer.write(f)
+
     print(f"Wrote {OUTPUT_PDF}")
 
 
 if __name__ == "__main__":
     main()
-
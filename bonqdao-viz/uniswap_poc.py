@@ -6,7 +6,7 @@ Slither Dependency Graph PoC
 Static analysis of Solidity contracts using Slither's Python API.
 
 Features:
-- Multi-file Solidity analysis (raw solc mode)
+- Multi-file Solidity analysis (single raw solc compilation)
 - Call graph extraction (Function -> Function)
 - State variable read/write dependency tracking
 - Boolean inclusion/exclusion filters
@@ -17,14 +17,18 @@ Run from a directory containing Solidity files, e.g.:
     python slither_dependency_graph.py
 
 Requirements:
-    pip install slither-analyzer pyyaml
+    pip install slither-analyzer pyyaml networkx orjson
 """
 
 import glob
-import json
+import os
+import re
+import orjson
 import yaml
-from collections import defaultdict, deque
-from typing import Dict, Set
+import networkx as nx
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, FrozenSet, Optional, Set, Tuple
 
 from slither.slither import Slither
 from slither.core.declarations.function import Function
@@ -55,16 +59,28 @@ EXCLUDE_NO_EFFECT_FUNCTIONS = True
 OUTPUT_JSON = "slither_dependency_graph.json"
 OUTPUT_YAML = "slither_dependency_graph.yaml"
 
+# Also emit the YAML copy (the JSON file is always written)
+WRITE_YAML = True
+
+# libyaml C emitter when PyYAML was built with it
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
 # ============================================================
 # FILTER FUNCTIONS
 # ============================================================
 
+def _alternation(strings) -> str:
+    # An empty tuple must match nothing, not everything
+    return "(?:" + ("|".join(map(re.escape, strings)) or "(?!)") + ")"
+
+_ALLOWED_VAR_RE = re.compile(_alternation(INCLUDE_VARIABLE_SUBSTRINGS), re.IGNORECASE)
+_EXCLUDED_FN_RE = re.compile(_alternation(EXCLUDE_FUNCTION_PREFIXES))
+
 def variable_name_allowed(name: str) -> bool:
-    lname = name.lower()
-    return any(substr in lname for substr in INCLUDE_VARIABLE_SUBSTRINGS)
+    return _ALLOWED_VAR_RE.search(name) is not None
 
 def function_name_allowed(name: str) -> bool:
-    return not name.startswith(EXCLUDE_FUNCTION_PREFIXES)
+    return _EXCLUDED_FN_RE.match(name) is None
 
 def function_semantically_relevant(reads: Set[str], writes: Set[str]) -> bool:
     if not EXCLUDE_NO_EFFECT_FUNCTIONS:
@@ -75,8 +91,22 @@ def function_semantically_relevant(reads: Set[str], writes: Set[str]) -> bool:
 # UTILITY FUNCTIONS
 # ============================================================
 
+# id(Function) -> "Contract.function"; cleared per Slither run
+_fid_cache: Dict[int, str] = {}
+
 def function_id(f: Function) -> str:
-    return f"{f.contract.name}.{f.name}"
+    k = id(f)
+    s = _fid_cache.get(k)
+    if s is None:
+        s = _fid_cache[k] = f"{f.contract.name}.{f.name}"
+    return s
+
+def allowed_variable_ids(variables) -> FrozenSet[str]:
+    return frozenset(
+        f"{v.contract.name}.{v.name}"
+        for v in variables
+        if variable_name_allowed(v.name)
+    )
 
 def is_entrypoint(f: Function) -> bool:
     return f.visibility in ("public", "external") and not f.is_constructor
@@ -87,91 +117,105 @@ def build_call_graph(functions):
     Filters out InternalCall / SolidityCall objects.
     """
     graph = defaultdict(set)
+    _F = Function
 
     for f in functions:
         for call in f.internal_calls:
-            if hasattr(call, "function") and isinstance(call.function, Function):
-                graph[f].add(call.function)
+            fn = getattr(call, "function", None)
+            if fn is not None and isinstance(fn, _F):
+                graph[f].add(fn)
 
     return graph
 
-def reachable_functions(start: Function, call_graph) -> Set[Function]:
+def reachable_functions(functions, call_graph) -> Dict[Function, Set[Function]]:
     """
-    Compute transitive closure of internal calls.
+    Compute transitive closure of internal calls for every function.
+    Each strongly connected component is resolved once, callees first.
     """
-    visited = {start}
-    queue = deque([start])
+    G = nx.DiGraph()
+    G.add_nodes_from(functions)
+    for f, callees in call_graph.items():
+        G.add_edges_from((f, g) for g in callees)
 
-    while queue:
-        current = queue.popleft()
-        for nxt in call_graph.get(current, []):
-            if nxt not in visited:
-                visited.add(nxt)
-                queue.append(nxt)
+    dag = nx.condensation(G)
+    scc_of = dag.graph["mapping"]
 
-    return visited
+    reach_scc = {}
+    for s in reversed(list(nx.topological_sort(dag))):
+        reach = set(dag.nodes[s]["members"])
+        for t in dag.successors(s):
+            reach |= reach_scc[t]
+        reach_scc[s] = reach
+
+    return {f: reach_scc[scc_of[f]] for f in G}
 
 # ============================================================
 # ANALYSIS
 # ============================================================
 
-def analyze_solidity_file(path: str) -> Dict[str, dict]:
+def analyze_all(paths) -> Dict[str, dict]:
     """
-    Analyze a single Solidity file as a compilation root.
+    Analyze one Solidity file, or a list of them, as a single compilation.
     """
-    sl = Slither(path, compile_force_framework="solc")
+    sl = Slither(paths, compile_force_framework="solc")
+    _fid_cache.clear()
 
     functions = []
     for contract in sl.contracts:
         functions.extend(contract.functions)
 
     call_graph = build_call_graph(functions)
+    reach = reachable_functions(functions, call_graph)
+
+    # Keyed by every call-graph node, so modifiers reached via internal_calls count too
+    fn_reads = {g: allowed_variable_ids(g.state_variables_read) for g in reach}
+    fn_writes = {g: allowed_variable_ids(g.state_variables_written) for g in reach}
 
     results = {}
 
-    for f in functions:
-        if not is_entrypoint(f):
-            continue
-        if not function_name_allowed(f.name):
-            continue
-
-        reachable = reachable_functions(f, call_graph)
-
-        reads = set()
-        writes = set()
-        callees = set()
-
-        for g in reachable:
-            if g is not f:
-                callees.add(function_id(g))
-
-            for v in g.state_variables_read:
-                if variable_name_allowed(v.name):
-                    reads.add(f"{v.contract.name}.{v.name}")
-
-            for v in g.state_variables_written:
-                if variable_name_allowed(v.name):
-                    writes.add(f"{v.contract.name}.{v.name}")
-
-        if not function_semantically_relevant(reads, writes):
-            continue
-
-        fid = function_id(f)
-        results[fid] = {
-            "entrypoint": True,
-            "reads": sorted(reads),
-            "writes": sorted(writes),
-            "calls": sorted(callees),
-        }
+    for contract in sl.contracts:
+        try:
+            for f in contract.functions:
+                if not is_entrypoint(f):
+                    continue
+                if not function_name_allowed(f.name):
+                    continue
+
+                reachable = reach[f]
+
+                reads = set().union(*(fn_reads[g] for g in reachable))
+                writes = set().union(*(fn_writes[g] for g in reachable))
+                callees = {function_id(g) for g in reachable if g is not f}
+
+                if not function_semantically_relevant(reads, writes):
+                    continue
+
+                fid = function_id(f)
+                results[fid] = {
+                    "entrypoint": True,
+                    "reads": sorted(reads),
+                    "writes": sorted(writes),
+                    "calls": sorted(callees),
+                }
+        except Exception as e:
+            print(f"[WARN] Skipped {contract.name}: {e}")
 
     return results
 
+def _safe_analyze(path: str) -> Tuple[Dict[str, dict], Optional[str]]:
+    """
+    Per-file analysis for the process pool; errors come back as strings.
+    """
+    try:
+        return analyze_all(path), None
+    except Exception as e:
+        return {}, str(e)
+
 # ============================================================
 # DRIVER
 # ============================================================
 
 def main():
-    all_functions = {}
     edges = []
 
     solidity_files = sorted(glob.glob(f"{SOLIDITY_DIR}/*.sol"))
@@ -179,13 +223,21 @@ def main():
     if not solidity_files:
         raise RuntimeError(f"No Solidity files found in '{SOLIDITY_DIR}/'")
 
-    for sol in solidity_files:
-        print(f"[+] Analyzing {sol}")
-        try:
-            per_file = analyze_solidity_file(sol)
-            all_functions.update(per_file)
-        except Exception as e:
-            print(f"[WARN] Skipped {sol}: {e}")
+    print(f"[+] Analyzing {len(solidity_files)} files")
+    try:
+        all_functions = analyze_all(solidity_files)
+    except Exception as e:
+        # Fall back to compiling each file on its own, in parallel
+        print(f"[WARN] Single compilation failed: {e}")
+        all_functions = {}
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+            for sol, (per_file, err) in zip(
+                solidity_files, ex.map(_safe_analyze, solidity_files)
+            ):
+                print(f"[+] Analyzed {sol}")
+                if err is not None:
+                    print(f"[WARN] Skipped {sol}: {err}")
+                all_functions.update(per_file)
 
     # Build explicit graph edges (function -> function)
     for fn, data in all_functions.items():
@@ -223,14 +275,16 @@ def main():
         }
     }
 
-    with open(OUTPUT_JSON, "w") as f:
-        json.dump(graph, f, indent=2)
+    with open(OUTPUT_JSON, "wb") as f:
+        f.write(orjson.dumps(graph, option=orjson.OPT_INDENT_2))
 
-    with open(OUTPUT_YAML, "w") as f:
-        yaml.safe_dump(graph, f, sort_keys=False)
+    if WRITE_YAML:
+        with open(OUTPUT_YAML, "w") as f:
+            yaml.dump(graph, f, Dumper=YAML_DUMPER, sort_keys=False)
 
     print(f"\n[✓] Wrote {OUTPUT_JSON}")
-    print(f"[✓] Wrote {OUTPUT_YAML}")
+    if WRITE_YAML:
+        print(f"[✓] Wrote {OUTPUT_YAML}")
     print(f"[✓] Functions included: {len(all_functions)}")
     print(f"[✓] Edges generated: {len(edges)}")
 
@@ -15,7 +15,8 @@ Run from the v2-core root:
     python uniswap_poc.py
 """
 
-from collections import defaultdict, deque
+from collections import defaultdict
+import networkx as nx
 from slither.slither import Slither
 from slither.core.declarations.function import Function
 
@@ -24,7 +25,18 @@ from slither.core.declarations.function import Function
 ROOT_CONTRACT = "contracts/UniswapV2Pair.sol"
 
 
+_fid_cache = {}
+
+
 def fn_id(f):
+    k = id(f)
+    s = _fid_cache.get(k)
+    if s is None:
+        s = _fid_cache[k] = _format_fn_id(f)
+    return s
+
+
+def _format_fn_id(f):
     # Normal internal function
     if hasattr(f, "contract") and hasattr(f, "name"):
         return f"{f.contract.name}.{f.name}"
@@ -82,10 +94,12 @@ def main():
     call_graph = defaultdict(set)
 
 
+    _F = Function
     for f in functions:
         for call in f.internal_calls:
-            if hasattr(call, "function") and isinstance(call.function, Function):
-                call_graph[f].add(call.function)
+            fn = getattr(call, "function", None)
+            if fn is not None and isinstance(fn, _F):
+                call_graph[f].add(fn)
 
 
     for f, callees in call_graph.items():
@@ -99,16 +113,23 @@ def main():
     # ------------------------------------------------------------------
     print_header("Reachability from entrypoints")
 
+    G = nx.DiGraph()
+    G.add_nodes_from(functions)
+    for f, callees in call_graph.items():
+        G.add_edges_from((f, g) for g in callees)
+
+    # Resolve each strongly connected component once, callees first
+    dag = nx.condensation(G)
+    scc_of = dag.graph["mapping"]
+    reach_scc = {}
+    for s in reversed(list(nx.topological_sort(dag))):
+        reach = set(dag.nodes[s]["members"])
+        for t in dag.successors(s):
+            reach |= reach_scc[t]
+        reach_scc[s] = reach
+
     def reachable(start):
-        seen = set([start])
-        q = deque([start])
-        while q:
-            cur = q.popleft()
-            for nxt in call_graph.get(cur, []):
-                if nxt not in seen:
-                    seen.add(nxt)
-                    q.append(nxt)
-        return seen
+        return reach_scc[scc_of[start]]
 
     for f in entrypoints:
         reach = reachable(f)
@@ -1,40 +1,48 @@
+import matplotlib
+matplotlib.use("Agg")
+
 import pandas as pd
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from pathlib import Path
 
 WAD = 10**18
 CSV_PATH = "data/price_impact.csv"
 OUT_PATH = Path("data/price_impact.png")
 
-df = pd.read_csv(CSV_PATH, dtype=str)
-
 NUM_COLS = ["amountIn", "amountOut", "priceInPerOut", "reserve0", "reserve1"]
+
+df = pd.read_csv(
+    CSV_PATH,
+    usecols=NUM_COLS,
+    thousands=",",
+    skipinitialspace=True,
+    float_precision="round_trip",
+    on_bad_lines="skip",
+)
+
+# Columns with non-numeric cells come back as strings; coerce those to NaN
 for c in NUM_COLS:
-    df[c] = (
-        df[c]
-        .str.strip()
-        .str.replace(",", "", regex=False)
-    )
-    df[c] = pd.to_numeric(df[c], errors="coerce")
+    if not pd.api.types.is_numeric_dtype(df[c]):
+        df[c] = pd.to_numeric(df[c].astype(str).str.replace(",", "", regex=False), errors="coerce")
 
 df = df.dropna(subset=NUM_COLS)
 df = df[df["amountOut"] > 0]
 
-df["currency_in"] = df["amountIn"] / WAD
-df["price"] = df["priceInPerOut"] / WAD
+df["currency_in"] = df["amountIn"].to_numpy() / WAD
+df["price"] = df["priceInPerOut"].to_numpy() / WAD
 
-plt.figure(figsize=(6, 4))
-plt.plot(df["currency_in"], df["price"])
-plt.xlabel("Currency in (tokens)")
-plt.ylabel("Effective price (CUR / ALT)")
-plt.title("Hoyu: price impact curve (currency → altcoin)")
-plt.grid(True)
+fig = Figure(figsize=(6, 4))
+ax = fig.add_subplot()
+ax.plot(df["currency_in"], df["price"])
+ax.set_xlabel("Currency in (tokens)")
+ax.set_ylabel("Effective price (CUR / ALT)")
+ax.set_title("Hoyu: price impact curve (currency → altcoin)")
+ax.grid(True)
 
 # Save instead of show
 OUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-plt.tight_layout()
-plt.savefig(OUT_PATH, dpi=150)
-plt.close()
+fig.tight_layout()
+fig.savefig(OUT_PATH, dpi=150)
 
 print(f"Saved plot to {OUT_PATH.resolve()}")
 